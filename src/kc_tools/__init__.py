@@ -1,4 +1,4 @@
 from . import kc_proc
-from .lines import pts2lines, batch_lines
+from .lines import pts2lines, batch_lines, write_lines, read_lines
 from .movement import Gateway
 from .graphs import get_node_seq, add_edges_GAL, add_edges_GDL
@@ -1,6 +1,7 @@
 """Tools to identify edges between nodes.
 """
 
+from collections import Counter
 import geopandas as gpd
 import networkx as nx
 import numpy as np
@@ -8,21 +9,6 @@ import pandas as pd
 import shapely
 
 
-def _shift_to_360(linestring):
-    """Shift a line from -180 to 180 longitude to 0 to 360 longitude."""
-    x1, y1 = linestring.coords[0]
-    x2, y2 = linestring.coords[1]
-    if x1 < 0:
-        x1 = x1 + 360
-    else:
-        pass
-    if x2 < 0:
-        x2 = x2 + 360
-    else:
-        pass
-    return shapely.LineString(((x1, y1), (x2, y2)))
-
-
 def get_node_seq(
     data,
     nodes,
@@ -35,6 +21,7 @@ def get_node_seq(
     node_label="label",
     node_geom="geometry",
     node_pt="point",
+    tree=None,
 ):
     """Generate a sequence of nodes from a sequence of line segments.
 
@@ -58,6 +45,8 @@ def get_node_seq(
     :type node_label: str, default: "label"
     :param node_geom: Name of column in ``nodes`` containing geometries.
     :type node_geom: str, default: "geometry"
+    :param tree: Spatial index of the node geometries, built if not given.
+    :type tree: shapely.STRtree, default: None
     :return (node_seq, unk): A tuple containing a node sequence and "unknown" line segments.
     :rtype: (pd.DataFrame, pd.DataFrame)
 
@@ -73,47 +62,57 @@ def get_node_seq(
 
        p_i = \\frac{n_i \cdot u}{u \cdot u} u
 
+    When processing many ships against the same nodes, build the spatial index once and pass it to each call. The index must be built from the node geometries in the same order as ``nodes``:
+
+    >>> tree = shapely.STRtree(nodes["geometry"].values)
+    >>> for sid, ship in lines.groupby("id"):
+    ...     node_seq, unk = kc.get_node_seq(ship, nodes, 20, 12, tree=tree)
+
     .. [#orth_proj] See the "Projection Formula" in Dan Margalit, Joseph Rabinoff, and Ben Williams, "Orthogonal Sets," in *Interactive Linear Algebra: UBC edition* (2024), <https://personal.math.ubc.ca/~tbjw/ila/orthogonal-sets.html>.
     """
     # Confirm single id number and get that id
-    if len(data[uid].unique()) > 1:
+    ids = data[uid].to_numpy()
+    sid = ids[0]
+    if np.any(ids != sid):
         print("ERROR: Data should only have a single ship id.")
         return None
-    else:
-        sid = data[uid].unique()[0]
-
-    # Confirm that t1, t2 are of type datetime64
-    if t1 not in data.select_dtypes(np.datetime64).columns:
-        data[t1] = pd.to_datetime(data[t1])
-    if t2 not in data.select_dtypes(np.datetime64).columns:
-        data[t2] = pd.to_datetime(data[t2])
-
-    # Add a timedelta column (length of time between points 1 and 2)
-    data["_timedelta"] = data[t2] - data[t1]
-    # Add an hours column
-    data["_hours"] = data["_timedelta"] / np.timedelta64(1, "h")
-
-# Add a column of linestrings shifted to 0--360 longitude scale
-    data["_l360"] = data[line].apply(lambda x: _shift_to_360(x))
 
-    # Identify possible stops
-    data["_poss_stop"] = data["_hours"] >= stop_duration
-
-    # Identify -180--180 break points
-    data["_br180"] = data[line].length >= dist_break
-    # Identify 0--360 break points
-    data["_br360"] = data["_l360"].length >= dist_break
-    # Identify break points
-    data["_break"] = (data["_br180"]) & (data["_br360"])
-
-    # Filter for possible stops, break points
-    subset = data[(data["_poss_stop"]) | (data["_break"])].copy()
+    # Get the possible stops and break points
+    t1_arr, t2_arr, line_geoms, brk = _find_stops(
+        data, dist_break, stop_duration, t1, t2, line
+    )
+    # Get the intersections of the line segments with the node geometries
+    node_idx, counts = _query_nodes(line_geoms, nodes[node_geom], tree)
+    starts = np.concatenate(([0], np.cumsum(counts)))
+    node_labels = nodes[node_label].to_numpy()
+
+    # Break is automatically not a multi-intersection (1 intersection). Line
+    # segments without intersections are "unknown" and add no nodes.
+    n_int = np.where(brk, 1, counts)
+    # Preallocate the node labels: one for each row of the node sequence
+    labels_out = np.empty(n_int.sum(), dtype=object)
+    pos = 0
+
+    for idx in range(len(line_geoms)):
+        if brk[idx]:
+            labels_out[pos] = "_BREAK"
+        else:
+            # Get the intersections with the node geometries
+            intsec = node_idx[starts[idx] : starts[idx + 1]]
+            # If one intersection, get node
+            if n_int[idx] == 1:
+                labels_out[pos] = node_labels[intsec[0]]
+            # If two or more intersections, use helper function to get sequence
+            elif n_int[idx] > 1:
+                cur_line = line_geoms[idx]  # Get the linestring
+                node_chk = nodes.iloc[intsec]  # Get the nodes to check
+                labels = _handle_multi(cur_line, node_chk, node_label, node_pt)
+                labels_out[pos : pos + n_int[idx]] = labels
+        pos += n_int[idx]
 
-    # Get indices of "_break", "line", "t1", "t2" columns
-    brk_idx = data.columns.get_loc("_break")
-    l_i = data.columns.get_loc(line)
-    t1_i = data.columns.get_loc(t1)
-    t2_i = data.columns.get_loc(t2)
+    # Repeat each line segment once for every node that it adds
+    seq_idx = np.repeat(np.arange(len(line_geoms)), n_int)
+    unk_idx = np.flatnonzero(n_int == 0)
 
     # Set up result: A sequence of nodes representing "stops."
     #
@@ -123,44 +122,109 @@ def get_node_seq(
     # - "t2": Line segment `t2`
     # - "line": The line segment.
     # - "num_intersect": Number of intersections between line and nodes.
+    node_seq = pd.DataFrame(
+        {
+            "id": sid,
+            "node": labels_out,
+            "t1": t1_arr[seq_idx],
+            "t2": t2_arr[seq_idx],
+            "line": line_geoms[seq_idx],
+            "num_intersect": n_int[seq_idx],
+        }
+    )
+    # Possible stops, but lacking intersections
+    unk = pd.DataFrame(
+        {
+            "id": sid,
+            "t1": t1_arr[unk_idx],
+            "t2": t2_arr[unk_idx],
+            "line": line_geoms[unk_idx],
+        }
+    )
+    return (node_seq, unk)
 
-    node_columns = ["id", "node", "t1", "t2", "line", "num_intersect"]
-    unk_columns = ["id", "t1", "t2", "line"]
-    node_seq = []  # Placeholder for node sequence
-    unk = []  # Placeholder for possible stops, but lacking intersections
-    add_node = True  # Add node(s), unless unknown
 
-    for row in subset.itertuples(index=False):
-        if row[brk_idx]:
-            # Break is automatically not a multi-intersection (1 intersection)
-            node = [[sid, "_BREAK", row[t1_i], row[t2_i], row[l_i], 1]]
-        else:
-            # Get the number of intersections with the node geometries
-            intsec = nodes[node_geom].intersects(row[l_i])
-            n_int = len(nodes[intsec])
-            # If no intersections, then store in `unk` list
-            if n_int == 0:
-                unk.append([sid, row[t1_i], row[t2_i], row[l_i]])
-                add_node = False  # Do not add nodes to node seq
-            # If one intersection, get node
-            elif n_int == 1:
-                label = nodes[intsec][node_label].values[0]
-                node = [[sid, label, row[t1_i], row[t2_i], row[l_i], n_int]]
-            # If two or more intersections, use helper function to get sequence
-            else:
-                cur_line = row[l_i]  # Get the linestring
-                node_chk = nodes[intsec]  # Get the nodes to check
-                labels = _handle_multi(cur_line, node_chk, node_label, node_pt)
-                node = []
-                for lbl in labels:
-                    node += [[sid, lbl, row[t1_i], row[t2_i], row[l_i], n_int]]
-        if add_node:
-            node_seq += node
-        else:
-            add_node = True
-    node_seq = pd.DataFrame(node_seq, columns=node_columns)
-    unk = pd.DataFrame(unk, columns=unk_columns)
-    return (node_seq, unk)
+def _find_stops(data, dist_break, stop_duration, t1, t2, line):
+    """Find line segments that are possible stops or break points.
+
+    :param data: Dataframe of line segments.
+    :type data: pd.DataFrame
+    :param dist_break: Minimum length of line segment to mark as a "break."
+    :type dist_break: int
+    :param stop_duration: Minimum duration of line segment to mark as a stop.
+    :type stop_duration: int
+    :param t1: Name of the column containing start times.
+    :type t1: str
+    :param t2: Name of the column containing end times.
+    :type t2: str
+    :param line: Name of the column containing line geometries.
+    :type line: str
+    :return (t1_arr, t2_arr, line_geoms, brk): Start times, end times, and line
+        geometries of the selected segments, and whether each one is a break.
+    :rtype: (np.array, np.array, np.array, np.array)
+    """
+    # Confirm that t1, t2 are of type datetime64
+    t1_ser = data[t1]
+    if not pd.api.types.is_datetime64_any_dtype(t1_ser):
+        t1_ser = pd.to_datetime(t1_ser)
+    t2_ser = data[t2]
+    if not pd.api.types.is_datetime64_any_dtype(t2_ser):
+        t2_ser = pd.to_datetime(t2_ser)
+
+    # Work on local arrays rather than adding helper columns to ``data``
+    line_arr = np.asarray(data[line].values)
+    # Length of time, in hours, between points 1 and 2
+    hours = ((t2_ser - t1_ser) / np.timedelta64(1, "h")).to_numpy()
+    # Line lengths on the -180--180 longitude scale
+    len180 = shapely.length(line_arr)
+    # Lengths on the 0--360 longitude scale, from the first two vertices
+    pt1 = shapely.get_point(line_arr, 0)
+    pt2 = shapely.get_point(line_arr, 1)
+    x1 = shapely.get_x(pt1)
+    x2 = shapely.get_x(pt2)
+    x1 = np.where(x1 < 0, x1 + 360, x1)
+    x2 = np.where(x2 < 0, x2 + 360, x2)
+    len360 = np.hypot(x2 - x1, shapely.get_y(pt2) - shapely.get_y(pt1))
+
+    # Identify possible stops
+    poss_stop = hours >= stop_duration
+    # Identify break points: long segments on both -180--180 and 0--360 scales
+    brk = (len180 >= dist_break) & (len360 >= dist_break)
+
+    # Filter for possible stops, break points
+    keep = np.flatnonzero(poss_stop | brk)
+    return (
+        t1_ser.to_numpy()[keep],
+        t2_ser.to_numpy()[keep],
+        line_arr[keep],
+        brk[keep],
+    )
+
+
+def _query_nodes(lines, node_geoms, tree=None):
+    """Find the nodes intersected by each line segment.
+
+    :param lines: The line segments.
+    :type lines: np.array
+    :param node_geoms: The node geometries.
+    :type node_geoms: gpd.GeoSeries, np.array
+    :param tree: Spatial index of ``node_geoms``, built if not given.
+    :type tree: shapely.STRtree, default: None
+    :return (node_idx, counts): Positions of intersected nodes, grouped by line
+        segment, and the number of intersected nodes for each line segment.
+    :rtype: (np.array, np.array)
+    """
+    # Query a spatial index of the nodes with every line segment at once. The
+    # result is a pair of arrays of (line, node) indices. GeoSeries cache their
+    # spatial index, so repeated calls with the same nodes reuse one tree.
+    if tree is None and isinstance(node_geoms, gpd.GeoSeries):
+        tree = node_geoms.sindex
+    elif tree is None:
+        tree = shapely.STRtree(np.asarray(node_geoms))
+    line_idx, node_idx = tree.query(lines, predicate="intersects")
+    node_idx = node_idx[np.lexsort((node_idx, line_idx))]
+    counts = np.bincount(line_idx, minlength=len(lines))
+    return (node_idx, counts)
 
 
 def _handle_multi(line, intsec, node_label, node_pt):
@@ -177,42 +241,34 @@ def _handle_multi(line, intsec, node_label, node_pt):
     :return labels: Tuple of labels, ordered by time.
     :type labels: (str, str)
     """
-    # Create a copy of the intersections
-    intsec = intsec.copy()
     line1 = np.array(line.coords[0])
     line2 = np.array(line.coords[1])
     # Check for vertical line (if vertical handle manually)
     if line1[0] == line2[0]:
         return ("_MULTI_MANUAL",) * len(intsec)
-    # Get coordinates of point as ``np.array``
-    intsec["_coord"] = intsec[node_pt].apply(lambda x: np.array(x.coords[0]))
-    # Move the line start to the origin; reposition the line stop and nodes
-    line1_adj = np.array((0, 0))
-    line2_adj = line2 - line1
-    intsec["_adj"] = intsec["_coord"].apply(lambda x: x - line1)
-    # Project nodes onto the line spanned by adjusted line stop
-    intsec["_proj_adj"] = intsec["_adj"].apply(lambda x: _proj_xu(x, line2_adj))
-    # Move the coordinates back to original area
-    intsec["_proj"] = intsec["_proj_adj"].apply(lambda x: x + line1)
+    # Get coordinates of the points as an (n, 2) ``np.array``
+    coords = shapely.get_coordinates(np.asarray(intsec[node_pt].values))
+    # Move the line start to the origin; reposition the line stop and nodes,
+    # project the nodes onto the line spanned by the adjusted line stop, and
+    # move the projections back to the original area
+    proj = _proj_xu(coords - line1, line2 - line1) + line1
     # Get the ``x`` coordinates of the projection
-    intsec["_x"] = intsec["_proj"].apply(lambda x: x[0])
+    xs = proj[:, 0]
     # Check that ``x`` values are unique; handle matching ``x`` values manually
-    if len(intsec) != len(intsec["_x"].unique()):
+    if len(xs) != len(np.unique(xs)):
         return ("_MULTI_MANUAL",) * len(intsec)
-    # Determine whether to sort ascending or descending
-    if line1[0] < line2[0]:
-        ascending = True
-    else:
-        ascending = False
-    intsec = intsec.sort_values("_x", ascending=ascending)
+    # Sort ascending if moving west to east, otherwise descending
+    order = np.argsort(xs)
+    if line1[0] >= line2[0]:
+        order = order[::-1]
     # Return the sorted labels
-    return tuple(intsec[node_label].values)
+    return tuple(intsec[node_label].to_numpy()[order])
 
 
 def _proj_xu(x, u):
-    """Project vector ``x`` onto the line spanned by ``u``."""
+    """Project vector ``x`` (or each row of ``x``) onto the line spanned by ``u``."""
 
-    return np.dot(x, u) / np.dot(u, u) * u
+    return (np.dot(x, u) / np.dot(u, u))[..., None] * u
 
 
 def add_edges_GDL(node_seq, GDL, breaks="_BREAK", weighted=True, self_loops=False):
@@ -241,14 +297,28 @@ def add_edges_GDL(node_seq, GDL, breaks="_BREAK", weighted=True, self_loops=Fals
     else:
         # Copy graph so that changes are not made to original graph
         graph = GDL.copy()
-        for from_node, to_node in zip(node_seq[:-1], node_seq[1:]):
-            if from_node == breaks or to_node == breaks:
-                pass
-            else:
-                if graph.has_edge(from_node, to_node) and weighted:
-                    graph[from_node][to_node]["weight"] += 1
+        # Pair each node with the next node in the sequence, in an object array
+        # so that the node labels keep their original types
+        seq = np.asarray(node_seq, dtype=object)
+        from_nodes = seq[:-1]
+        to_nodes = seq[1:]
+        # Skip pairs that include a break and, unless allowed, self loops
+        mask = (from_nodes != breaks) & (to_nodes != breaks)
+        if not self_loops:
+            mask &= from_nodes != to_nodes
+        edges = list(zip(from_nodes[mask], to_nodes[mask]))
+        # Increment weights by the count of each edge if weighted
+        if weighted:
+            # Look up edges in the adjacency dict directly
+            adj = graph._adj
+            for (from_node, to_node), count in Counter(edges).items():
+                nbrs = adj.get(from_node)
+                if nbrs is not None and to_node in nbrs:
+                    nbrs[to_node]["weight"] += count
                 else:
-                    graph.add_edge(from_node, to_node, weight=1)
+                    graph.add_edge(from_node, to_node, weight=count)
+        else:
+            graph.add_edges_from(edges, weight=1)
         return graph
 
 
@@ -285,15 +355,17 @@ def add_edges_GAL(node_seq, GAL, breaks="_BREAK", weighted=True, self_loops=Fals
             idx_add = 0
         else:
             idx_add = 1
-        edges = []
-        for idx1 in range(len(node_set) - 1):
-            for idx2 in range(idx1 + idx_add, len(node_set)):
-                edges.append((node_set[idx1], node_set[idx2]))
+        idx1, idx2 = np.triu_indices(len(node_set), k=idx_add)
+        edges = list(zip(node_set[idx1], node_set[idx2]))
         # Increment weights if weighted, or simply add edges
         if weighted:
+            # Look up edges in the adjacency dict directly; both directions of
+            # an undirected edge share the same attribute dict
+            adj = graph._adj
             for edge in edges:
-                if graph.has_edge(edge[0], edge[1]):
-                    graph[edge[0]][edge[1]]["weight"] += 1
+                nbrs = adj.get(edge[0])
+                if nbrs is not None and edge[1] in nbrs:
+                    nbrs[edge[1]]["weight"] += 1
                 else:
                     graph.add_edge(edge[0], edge[1], weight=1)
         else:
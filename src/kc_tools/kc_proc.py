@@ -23,17 +23,17 @@ Use ``kc_tools.kc_proc.proc_year`` to clean the preprocessed data in
 
 """
 
+import concurrent.futures
 import datetime
-import numpy as np
 import pandas as pd
 import pathlib
 
 # Default column names on load
 _COL_LOAD = ["year", "month", "day", "hour", "lat_in", "long_in", "id", "dck"]
 # Default data types on load
-_DTYPE_LOAD = {"id": str, "lat_in": str, "hour": float}
-# Alternative data types, for cases where "hour" field is only spaces "    "
-_DTYPE_ALT = {"id": str, "lat_in": str, "hour": str}
+_DTYPE_LOAD = {"id": str, "lat_in": float, "long_in": float, "hour": float}
+# Missing values on load: fixed-width fields can be only spaces, e.g. "    "
+_NA_LOAD = {"hour": ["    "], "lat_in": ["     "], "long_in": ["      "]}
 # Default output column names
 _OUT_COL = ["t", "lat", "long", "id", "dck"]
 
@@ -46,18 +46,9 @@ def load_raw(path):
     :return df: The data.
     :rtype df: pd.DataFrame
     """
-    # Try the default load
-    try:
-        df = pd.read_csv(path, names=_COL_LOAD, dtype=_DTYPE_LOAD)
-    # Clean the "hour" column if it fails to load as float (i.e. has entries
-    # consisting of empty spaces).
-    except ValueError:
-        df = pd.read_csv(path, names=_COL_LOAD, dtype=_DTYPE_ALT)
-        # Remove white space, and replace empty strings with np.nan values
-        df["hour"] = df["hour"].str.strip()
-        df["hour"] = df["hour"].replace("", np.nan)
-        # Convert type back to float
-        df["hour"] = df["hour"].astype(float)
+    # Read blank fields as missing values, so that the numeric columns parse as
+    # float in a single pass
+    df = pd.read_csv(path, names=_COL_LOAD, dtype=_DTYPE_LOAD, na_values=_NA_LOAD)
     return df
 
 
@@ -69,17 +60,12 @@ def _proc_long180(df, l_col):
     """
     df["long180"] = df[l_col]
     df["long180"] = df["long180"].case_when([(df[l_col] > 18000, df[l_col] - 36000)])
-    # Convert to string for processing as coordinate
-    df["long180"] = df["long180"].astype(str)
     return df
 
 
 def _proc_coord(df, col):
-    """Process latitude and longitude to degrees to two decimal places."""
-    left = df[col].str.strip().str[:-2]
-    right = df[col].str.strip().str[-2:]
-    new_col = left + "." + right
-    return new_col
+    """Process latitude and longitude from hundredths of a degree to degrees."""
+    return df[col] / 100
 
 
 def proc_kobe(df):
@@ -107,6 +93,14 @@ def proc_kobe(df):
     return df
 
 
+def _proc_month(path):
+    """Load and process one month of data; ``None`` if the month is empty."""
+    df = load_raw(path)
+    if df.shape[0] == 0:
+        return None
+    return proc_kobe(df)
+
+
 def proc_year(yr, path):
     """Process Kobe Collection data by year.
 
@@ -118,16 +112,14 @@ def proc_year(yr, path):
     :rtype: pd.DataFrame
     """
     path = pathlib.Path(path)
-    df = load_raw(path / f"{yr}-01.csv")
-    df = proc_kobe(df)
-    for month in range(2, 13):
-        mo = str(month).rjust(2, "0")
-        new_df = load_raw(path / f"{yr}-{mo}.csv")
-        new_df = proc_kobe(new_df)
-        if df.shape[0] == 0:
-            df = new_df
-        elif new_df.shape[0] == 0:
-            pass
-        else:
-            df = pd.concat([df, new_df], axis=0, ignore_index=True)
+    paths = [path / f"{yr}-{str(month).rjust(2, '0')}.csv" for month in range(1, 13)]
+    # Load and process the months in parallel; pandas releases the GIL while
+    # parsing CSV files
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(paths)) as ex:
+        dfs = list(ex.map(_proc_month, paths))
+    # Keep the non-empty months and concatenate them once
+    dfs = [df for df in dfs if df is not None]
+    if len(dfs) == 0:
+        return pd.DataFrame(columns=_OUT_COL)
+    df = pd.concat(dfs, axis=0, ignore_index=True)
     return df.sort_values("t").reset_index(drop=True)
@@ -2,10 +2,40 @@
 """
 
 import geopandas as gpd
+import numpy as np
 import pandas as pd
 import shapely
 
 
+def _build_lines(t_arr, x_arr, y_arr, retain_pts, pairs=None):
+    """Build line segments between each sequential pair of points.
+
+    The points are given as arrays of times and coordinates. ``pairs`` is an
+    optional boolean mask selecting which of the sequential pairs to keep.
+    """
+    if pairs is None:
+        pairs = slice(None)
+    res = pd.DataFrame(
+        {
+            "t1": t_arr[:-1][pairs],
+            "t2": t_arr[1:][pairs],
+            "x1": x_arr[:-1][pairs],
+            "y1": y_arr[:-1][pairs],
+            "x2": x_arr[1:][pairs],
+            "y2": y_arr[1:][pairs],
+        }
+    )
+    # Generate linestring geometry from an (n, 2, 2) array of coordinates
+    coords = np.stack(
+        (res[["x1", "y1"]].to_numpy(), res[["x2", "y2"]].to_numpy()), axis=1
+    )
+    res["line"] = shapely.linestrings(coords)
+    if retain_pts:
+        return res[["t1", "t2", "x1", "y1", "x2", "y2", "line"]]
+    else:
+        return res[["t1", "t2", "line"]]
+
+
 def pts2lines(df, dt_col="t", lat_col="lat", long_col="long", retain_pts=True):
     """Generate a dataframe of line segments from point data.
 
@@ -26,30 +56,18 @@ def pts2lines(df, dt_col="t", lat_col="lat", long_col="long", retain_pts=True):
     """
     df = df.sort_values(dt_col)  # Ensure that the dates are sorted
     df = df.dropna(axis=0)  # Remove rows with missing values
-    res = pd.DataFrame(
-        {
-            "t1": df[dt_col][:-1].values,
-            "t2": df[dt_col][1:].values,
-            "x1": df[long_col][:-1].values,
-            "x2": df[long_col][1:].values,
-            "y1": df[lat_col][:-1].values,
-            "y2": df[lat_col][1:].values,
-        }
+    return _build_lines(
+        df[dt_col].to_numpy(),
+        df[long_col].to_numpy(),
+        df[lat_col].to_numpy(),
+        retain_pts,
     )
-    # Generate linestring geometry
-    res["line"] = res.apply(
-        lambda r: shapely.LineString([[r.x1, r.y1], [r.x2, r.y2]]), axis=1
-    )
-    if retain_pts:
-        return res[["t1", "t2", "x1", "y1", "x2", "y2", "line"]]
-    else:
-        return res[["t1", "t2", "line"]]
 
 
 def batch_lines(df, t="t", x="long", y="lat", uid="id", retain_pts=True):
     """Generate a dataframe of line segments organized by id.
 
-    For each unique ID, ``pts2lines`` is used to generate line segments for that moving object. The line segments are then concatenated back into a single dataframe.
+    Points are sorted by ID and time, and line segments are generated between each sequential pair of points belonging to the same moving object. All line segments are built in a single pass over the data, with IDs in order of first appearance.
 
     :param df: The point data.
     :type df: pd.DataFrame
@@ -86,17 +104,63 @@ def batch_lines(df, t="t", x="long", y="lat", uid="id", retain_pts=True):
     >>> import geopandas as gpd
     >>> df = pd.read_csv(file)
     >>> gdf = gpd.GeoDataFrame(df, geometry="line")
+
+    To store the line segments in a format that loads without parsing text, use ``write_lines`` and ``read_lines``.
     """
-    res = []
-    for val in df[uid].unique():
-        subset = df[df[uid] == val]
-        if subset.shape[0] > 1:  # Must have two or more points in sequence
-            lines = pts2lines(subset, retain_pts=retain_pts)
-            lines["id"] = val
-            res.append(lines)
-        else:
-            pass
-    if len(res) > 0:
-        # Concatenate the results back into a single data frame
-        res = pd.concat(res, axis=0, ignore_index=True)
+    # Number the ids in order of first appearance, then remove rows with missing
+    # values
+    keep = df.notna().all(axis=1).to_numpy()
+    codes = pd.factorize(df[uid])[0][keep]
+    df = df[keep]
+    # Sort by id and time with two stable sorts, so that each ship's points are
+    # contiguous and ordered
+    order = np.argsort(df[t].to_numpy(), kind="stable")
+    order = order[np.argsort(codes[order], kind="stable")]
+    codes = codes[order]
+    t_arr = df[t].to_numpy()[order]
+    x_arr = df[x].to_numpy()[order]
+    y_arr = df[y].to_numpy()[order]
+    id_arr = df[uid].to_numpy()[order]
+    # Keep only pairs of sequential points from the same ship
+    same = codes[:-1] == codes[1:]
+    if not same.any():
+        return []
+    res = _build_lines(t_arr, x_arr, y_arr, retain_pts, pairs=same)
+    res["id"] = id_arr[:-1][same]
     return res
+
+
+def write_lines(lines, path, line_col="line"):
+    """Write a dataframe of line segments to a Parquet file.
+
+    The line segments are stored in GeoArrow format, which is faster to write and to load than WKT text in a CSV file. Requires ``pyarrow``.
+
+    :param lines: Dataframe of line segments, e.g. from ``batch_lines``.
+    :type lines: pd.DataFrame
+    :param path: The file to write.
+    :type path: str, pathlib.Path
+    :param line_col: Name of the column containing the line segments.
+    :type line_col: str, default: "line"
+    """
+    gdf = gpd.GeoDataFrame(lines, geometry=line_col)
+    gdf.to_parquet(path, index=False, geometry_encoding="geoarrow")
+
+
+def read_lines(path):
+    """Read a Parquet file of line segments written by ``write_lines``.
+
+    Requires ``pyarrow``.
+
+    :param path: The file to read.
+    :type path: str, pathlib.Path
+    :return: Dataframe of line segments.
+    :rtype: gpd.GeoDataFrame
+
+    Example usage:
+
+    >>> import kc_tools as kc
+    >>> lines = kc.batch_lines(df)
+    >>> kc.write_lines(lines, "lines.parquet")
+    >>> gdf = kc.read_lines("lines.parquet")
+    """
+    return gpd.read_parquet(path)
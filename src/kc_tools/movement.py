@@ -50,18 +50,20 @@ def _calc_b(m, x1, y1):
 def _std_form_params(x1, y1, x2, y2):
     """Get the standard form of the line between the two points.
 
-    Returns ``A``, ``B``, and ``C`` of :math:`Ax + By + C = 0`.
+    Returns ``A``, ``B``, and ``C`` of :math:`Ax + By + C = 0`. The coordinates
+    may be scalars or arrays; ``A`` and ``B`` are stacked along the last axis.
     """
-    # Check for vertical line
-    if x1 == x2:
-        A = 1
-        B = 0
-        C = -x1
-    else:
-        A = _calc_m(x1, y1, x2, y2)
-        B = -1
-        C = _calc_b(A, x1, y1)
-    return (np.array([A, B]), C)
+    x1, y1, x2, y2 = (np.asarray(v, dtype=float) for v in (x1, y1, x2, y2))
+    # Check for vertical lines, whose slope is discarded below
+    vert = x1 == x2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        m = _calc_m(x1, y1, x2, y2)
+        b = _calc_b(m, x1, y1)
+    A = np.where(vert, 1.0, m)
+    B = np.where(vert, 0.0, -1.0)
+    # Adding 0.0 turns -0.0 into 0.0 for vertical lines on x = 0
+    C = np.where(vert, -x1 + 0.0, b)
+    return (np.stack([A, B], axis=-1), C)
 
 
 def _get_midpt(pt1, pt2):
@@ -89,19 +91,121 @@ class Gateway:
     """
 
     def __init__(self, pt1, pt2):
-        self.pt1 = np.array(pt1)
-        self.pt2 = np.array(pt2)
+        vec, offset = _std_form_params(pt1[0], pt1[1], pt2[0], pt2[1])
+        self._set_params(
+            np.array(pt1),
+            np.array(pt2),
+            _get_midpt(pt1, pt2),
+            shapely.LineString([pt1, pt2]),
+            vec,
+            offset,
+        )
+
+    def _set_params(self, pt1, pt2, midpt, line, vec, offset):
+        self.pt1 = pt1
+        self.pt2 = pt2
         self.is_vert = self.pt1[0] == self.pt2[0]
-        self.midpt = _get_midpt(pt1, pt2)
-        self.line = shapely.LineString([pt1, pt2])
-        self.vec, self.offset = _std_form_params(pt1[0], pt1[1], pt2[0], pt2[1])
+        self.midpt = midpt
+        self.line = line
+        # Store the coefficients as Python floats for the classification methods
+        self._A = float(vec[0])
+        self._B = float(vec[1])
+        self.offset = float(offset)
+
+    @property
+    def vec(self):
+        """The vector :math:`(A, B)` normal to the gateway."""
+        return np.array([self._A, self._B])
+
+    @classmethod
+    def from_arrays(cls, pts1, pts2):
+        """Create many gateways at once from arrays of points.
+
+        :param pts1: The first point of each gateway, with shape ``(n, 2)``.
+        :type pts1: np.array
+        :param pts2: The second point of each gateway, with shape ``(n, 2)``.
+        :type pts2: np.array
+        :return: The gateways.
+        :rtype: list of Gateway
+        """
+        pts1 = np.asarray(pts1, dtype=float)
+        pts2 = np.asarray(pts2, dtype=float)
+        # Calculate the line parameters, midpoints, and lines for all gateways
+        vecs, offsets = _std_form_params(
+            pts1[:, 0], pts1[:, 1], pts2[:, 0], pts2[:, 1]
+        )
+        midpts = pts1 + (pts2 - pts1) / 2
+        lines = shapely.linestrings(np.stack((pts1, pts2), axis=1))
+        gateways = []
+        for i in range(len(pts1)):
+            gateway = cls.__new__(cls)
+            gateway._set_params(
+                pts1[i], pts2[i], midpts[i], lines[i], vecs[i], offsets[i]
+            )
+            gateways.append(gateway)
+        return gateways
 
     def classify_pt(self, pt):
-        pt = np.array(pt)
-        return self.vec @ pt + self.offset
+        return self._A * pt[0] + self._B * pt[1] + self.offset
+
+    def classify_array(self, xs, ys, out=None):
+        """Classify arrays of x and y coordinates.
 
-    def classify_array(self, xs, ys):
-        return self.vec[0] * xs + self.vec[1] * ys + self.offset
+        :param xs: An array of x coordinates.
+        :type xs: np.array
+        :param ys: An array of y coordinates.
+        :type ys: np.array
+        :param out: Optional array in which to write the result, without allocating temporary arrays.
+        :type out: np.array, default: None
+        :return: The classification of each point, of the same type as the inputs, or ``out`` if given.
+        :rtype: np.array, pd.Series, or float
+        """
+        # Without a buffer, keep the input type (e.g. a pd.Series or a scalar)
+        if out is None:
+            return self._A * xs + self._B * ys + self.offset
+        xs = np.asarray(xs)
+        ys = np.asarray(ys)
+        # ``B`` is either 0 (vertical gateway) or -1
+        if self._B and np.shares_memory(out, ys):
+            # Writing ``A * xs`` into ``out`` first would overwrite ``ys``
+            out[...] = self._A * xs - ys + self.offset
+            return out
+        # Write each step into a single output array to avoid temporaries
+        np.multiply(xs, self._A, out=out)
+        if self._B:
+            np.subtract(out, ys, out=out)
+        np.add(out, self.offset, out=out)
+        return out
+
+    @classmethod
+    def classify_many(cls, gateways, xs, ys):
+        """Classify arrays of x and y coordinates against several gateways.
+
+        :param gateways: The gateways.
+        :type gateways: list of Gateway
+        :param xs: An array of x coordinates.
+        :type xs: np.array
+        :param ys: An array of y coordinates.
+        :type ys: np.array
+        :return: The classification of each point by each gateway, with shape ``(len(gateways), *xs.shape)``.
+        :rtype: np.array
+        """
+        # Accept the same inputs as ``classify_array``, e.g. a pd.Series
+        xs = np.asarray(xs)
+        ys = np.asarray(ys)
+        shape = np.broadcast(xs, ys).shape
+        # Gateway coefficients as column arrays that broadcast against the points
+        coef_shape = (len(gateways),) + (1,) * len(shape)
+        A = np.array([g._A for g in gateways]).reshape(coef_shape)
+        has_B = np.array([g._B != 0 for g in gateways], dtype=bool)
+        has_B = has_B.reshape(coef_shape)
+        C = np.array([g.offset for g in gateways]).reshape(coef_shape)
+        out = np.empty((len(gateways),) + shape)
+        np.multiply(xs, A, out=out)
+        # ``B`` is either 0 (vertical gateway) or -1
+        np.subtract(out, ys, out=out, where=has_B)
+        np.add(out, C, out=out)
+        return out
 
     def get_xys(self, xs):
         """Get x, y coordinates to plot the line.
@@ -122,4 +226,4 @@ class Gateway:
             xs = np.ones(len(xs)) * (-self.offset)
             return (xs, ys)
         else:
-            return (xs, self.vec[0] * xs + self.offset)
+            return (xs, self._A * xs + self.offset)